@@ -3,6 +3,23 @@ import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+try:
+    import talib
+except ImportError:
+    talib = None
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# Cython build of the kernels (python setup.py build_ext --inplace)
+try:
+    import _strategy
+except ImportError:
+    _strategy = None
+
 # === STRATEGY CONFIGURATION ===
 INITIAL_BALANCE = 1000
 STOP_LOSS_PIPS = 20
@@ -12,147 +29,322 @@ SPREAD = 0.0002
 BOLLINGER_WINDOW = 20
 BOLLINGER_STD = 2
 
+
 # === SIMULATE MARKET DATA ===
-np.random.seed(1)
-dates = pd.date_range(start="2024-01-01", periods=300, freq="H")
-price = 1.1000 + np.cumsum(np.random.randn(len(dates)) * 0.0015)
+def make_sample_data(periods=300, seed=1):
+    """Random-walk hourly OHLC data for trying the strategy out."""
+    np.random.seed(seed)
+    dates = pd.date_range(start="2024-01-01", periods=periods, freq="h")
+    price = 1.1000 + np.cumsum(np.random.randn(len(dates)) * 0.0015)
+
+    df = pd.DataFrame(index=dates)
+    df["Open"] = price
+    df["High"] = df["Open"] + np.random.rand(len(df)) * 0.0015
+    df["Low"] = df["Open"] - np.random.rand(len(df)) * 0.0015
+    df["Close"] = df["Open"] + (np.random.rand(len(df)) - 0.5) * 0.0015
+    return df
 
-df = pd.DataFrame(index=dates)
-df["Open"] = price
-df["High"] = df["Open"] + np.random.rand(len(df)) * 0.0015
-df["Low"] = df["Open"] - np.random.rand(len(df)) * 0.0015
-df["Close"] = df["Open"] + (np.random.rand(len(df)) - 0.5) * 0.0015
 
 # === BOLLINGER BANDS ===
-df["MA"] = df["Close"].rolling(window=BOLLINGER_WINDOW).mean()
-df["STD"] = df["Close"].rolling(window=BOLLINGER_WINDOW).std()
-df["Upper"] = df["MA"] + BOLLINGER_STD * df["STD"]
-df["Lower"] = df["MA"] - BOLLINGER_STD * df["STD"]
+@njit(cache=True)
+def bollinger(close, n, k):
+    """Rolling mean, sample std and the k-std bands in a single pass.
+
+    Uses a sliding-window Welford update so the variance does not suffer
+    from cancellation the way a running sum of squares does. Matches
+    pandas' rolling(n): a value is NaN until the window holds n finite
+    closes, so a NaN only blanks the n bars it is part of, and the std
+    (and bands) are NaN for n < 2.
+    """
+    if n < 1:
+        raise ValueError("window must be at least 1")
+
+    size = len(close)
+    ma = np.empty(size, dtype=np.float64)
+    std = np.empty(size, dtype=np.float64)
+    upper = np.empty(size, dtype=np.float64)
+    lower = np.empty(size, dtype=np.float64)
+
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(size):
+        x = close[i]
+        if np.isfinite(x):
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+
+        if i >= n:
+            old = close[i - n]
+            if np.isfinite(old):
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = old - mean
+                    mean -= delta / count
+                    m2 -= delta * (old - mean)
+
+        if count < n:
+            ma[i] = np.nan
+            std[i] = np.nan
+            upper[i] = np.nan
+            lower[i] = np.nan
+        else:
+            sd = np.sqrt(max(m2, 0.0) / (n - 1)) if n > 1 else np.nan
+            ma[i] = mean
+            std[i] = sd
+            upper[i] = mean + k * sd
+            lower[i] = mean - k * sd
+
+    return ma, std, upper, lower
+
+
+def bollinger_bands(close, n, k):
+    """Return (upper, ma, lower), using TA-Lib's BBANDS when it is installed."""
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    # BBANDS lets a NaN spread through the rest of the series and has no
+    # sample std for n < 2, so those inputs go to the kernel instead.
+    if talib is None or n < 2 or not np.isfinite(close).all():
+        ma, _, upper, lower = bollinger(close, n, k)
+        return upper, ma, lower
+    # BBANDS uses the population std; scale the multiplier so the bands
+    # match the sample std (ddof=1) of the fallback kernel and pandas.
+    nbdev = k * np.sqrt(n / (n - 1))
+    return talib.BBANDS(close, timeperiod=n, nbdevup=nbdev, nbdevdn=nbdev, matype=0)
+
 
 # === SIGNAL GENERATION ===
-df["Signal"] = None
-position = False
+# Signals are kept as int8 codes end to end (generation, backtest, plotting)
+SIGNAL_NONE, SIGNAL_BUY, SIGNAL_SELL = 0, 1, 2
 
-for i in range(BOLLINGER_WINDOW, len(df)):
-    close = df["Close"].iloc[i]
-    upper = df["Upper"].iloc[i]
-    lower = df["Lower"].iloc[i]
 
-    if not position and close < lower:
-        df.iloc[i, df.columns.get_loc("Signal")] = "Buy"
-        position = True
-    elif position and close > upper:
-        df.iloc[i, df.columns.get_loc("Signal")] = "Sell"
-        position = False
+@njit(cache=True)
+def generate_signals(close, upper, lower, start):
+    """Scan the bands once, carrying the open-position flag between bars.
+
+    Returns an int8 array of SIGNAL_NONE / SIGNAL_BUY / SIGNAL_SELL codes.
+    """
+    signals = np.zeros(len(close), dtype=np.int8)
+    position = False
+
+    for i in range(start, len(close)):
+        if not position and close[i] < lower[i]:
+            signals[i] = SIGNAL_BUY
+            position = True
+        elif position and close[i] > upper[i]:
+            signals[i] = SIGNAL_SELL
+            position = False
+
+    return signals
+
 
 # === BACKTESTING ===
-balance = INITIAL_BALANCE
-equity = [balance]
-open_trade = None
-trades = []
-
-for i in range(len(df)):
-    row = df.iloc[i]
-    signal = row["Signal"]
-    price = row["Close"]
-
-    if signal == "Buy" and not open_trade:
-        entry = price + SPREAD
-        sl = entry - STOP_LOSS_PIPS * PIP_VALUE
-        tp = entry + TAKE_PROFIT_PIPS * PIP_VALUE
-        open_trade = {"entry": entry, "sl": sl, "tp": tp, "entry_time": row.name}
-
-    elif open_trade:
-        low = row["Low"]
-        high = row["High"]
-        exit_price = None
-        result = None
-
-        if low <= open_trade["sl"]:
-            exit_price = open_trade["sl"]
-            result = "Loss"
-        elif high >= open_trade["tp"]:
-            exit_price = open_trade["tp"]
-            result = "Win"
-
-        if exit_price:
-            pips = (exit_price - open_trade["entry"]) / PIP_VALUE
-            balance += pips
-            trades.append({
-                "entry_time": open_trade["entry_time"],
-                "exit_time": row.name,
-                "entry": open_trade["entry"],
-                "exit": exit_price,
-                "pips": round(pips, 1),
-                "result": result,
-                "balance": round(balance, 2)
-            })
-            open_trade = None
-
-    equity.append(balance)
-
-df["Equity"] = equity[:len(df)]
+# Trade results are int8 codes; RESULT_LABELS[trades_df["result"]] gives
+# the Loss/Win strings for display
+RESULT_LOSS, RESULT_WIN = 0, 1
+RESULT_LABELS = np.array(["Loss", "Win"])
+
+
+@njit(cache=True)
+def _run_backtest(close, high, low, signal_code, sl_pips, tp_pips, pip_value, spread, initial_balance):
+    """Simulate one long position at a time with fixed SL/TP.
+
+    Trades are returned as parallel arrays (entry/exit bar index, prices,
+    pips, result code, balance after the trade) together with the
+    per-bar equity curve.
+    """
+    n = len(close)
+    entry_idx = np.empty(n, dtype=np.int64)
+    exit_idx = np.empty(n, dtype=np.int64)
+    entries = np.empty(n, dtype=np.float64)
+    exits = np.empty(n, dtype=np.float64)
+    pips = np.empty(n, dtype=np.float64)
+    results = np.empty(n, dtype=np.int8)
+    balances = np.empty(n, dtype=np.float64)
+    equity = np.empty(n, dtype=np.float64)
+
+    balance = initial_balance
+    in_trade = False
+    open_trade_idx = 0
+    open_trade_entry = 0.0
+    sl = 0.0
+    tp = 0.0
+    n_trades = 0
+
+    for i in range(n):
+        if signal_code[i] == SIGNAL_BUY and not in_trade:
+            open_trade_entry = close[i] + spread
+            sl = open_trade_entry - sl_pips * pip_value
+            tp = open_trade_entry + tp_pips * pip_value
+            open_trade_idx = i
+            in_trade = True
+
+        elif in_trade:
+            closed = False
+            exit_price = 0.0
+            result = RESULT_LOSS
+            if low[i] <= sl:
+                exit_price = sl
+                closed = True
+            elif high[i] >= tp:
+                exit_price = tp
+                result = RESULT_WIN
+                closed = True
+
+            if closed:
+                trade_pips = (exit_price - open_trade_entry) / pip_value
+                balance += trade_pips
+                entry_idx[n_trades] = open_trade_idx
+                exit_idx[n_trades] = i
+                entries[n_trades] = open_trade_entry
+                exits[n_trades] = exit_price
+                pips[n_trades] = trade_pips
+                results[n_trades] = result
+                balances[n_trades] = balance
+                n_trades += 1
+                in_trade = False
+
+        equity[i] = balance
+
+    return (entry_idx[:n_trades], exit_idx[:n_trades], entries[:n_trades], exits[:n_trades],
+            pips[:n_trades], results[:n_trades], balances[:n_trades], equity)
+
+
+# Prefer the compiled Cython kernels when they have been built; the numba
+# versions stay reachable so the two builds can be compared
+_numba_kernels = {"bollinger": bollinger, "generate_signals": generate_signals,
+                  "backtest": _run_backtest}
+if _strategy is not None:
+    bollinger = _strategy.bollinger
+    generate_signals = _strategy.generate_signals
+    _run_backtest = _strategy.backtest
+
+
+def backtest(df, sl_pips, tp_pips, pip_value, spread, initial_balance):
+    """Run the compiled backtest and rebuild the trade log as a DataFrame."""
+    entry_idx, exit_idx, entries, exits, pips, results, balances, equity = _run_backtest(
+        df["Close"].to_numpy(dtype=np.float64), df["High"].to_numpy(dtype=np.float64),
+        df["Low"].to_numpy(dtype=np.float64), df["Signal"].to_numpy(dtype=np.int8),
+        sl_pips, tp_pips, pip_value, spread, float(initial_balance))
+
+    trades_df = pd.DataFrame({
+        "entry_time": df.index[entry_idx],
+        "exit_time": df.index[exit_idx],
+        "entry": entries,
+        "exit": exits,
+        "pips": np.round(pips, 1),
+        "result": results,
+        "balance": np.round(balances, 2)
+    })
+    return trades_df, equity
+
 
 # === PERFORMANCE METRICS ===
-trades_df = pd.DataFrame(trades)
-
-if not trades_df.empty:
-    win_rate = 100 * len(trades_df[trades_df["result"] == "Win"]) / len(trades_df)
-    net_profit = balance - INITIAL_BALANCE
-    max_dd = round(np.max([INITIAL_BALANCE - e for e in df["Equity"]]), 2)
-    metrics = [
-        ["Win Rate (%)", f"{win_rate:.2f}%"],
-        ["Net Profit ($)", f"{net_profit:.2f}"],
-        ["Final Balance ($)", f"{balance:.2f}"],
-        ["Max Drawdown ($)", f"{max_dd:.2f}"]
-    ]
-else:
-    metrics = [["Note", "No trades executed"]]
+def compute_metrics(trades_df, equity, initial_balance):
+    """Metric names and values for the table, as two parallel lists."""
+    if trades_df.empty:
+        return ["Note"], ["No trades executed"]
+
+    balance = equity[-1]
+    wins = int(trades_df["result"].to_numpy().sum())
+    win_rate = 100 * wins / len(trades_df)
+    net_profit = balance - initial_balance
+    peaks = np.maximum.accumulate(equity)
+    max_dd = round(float((peaks - equity).max()), 2)
+    metric_names = ["Win Rate (%)", "Net Profit ($)", "Final Balance ($)", "Max Drawdown ($)"]
+    metric_values = [f"{win_rate:.2f}%", f"{net_profit:.2f}", f"{balance:.2f}", f"{max_dd:.2f}"]
+    return metric_names, metric_values
+
+
+def run(df, *, window=BOLLINGER_WINDOW, k=BOLLINGER_STD, sl_pips=STOP_LOSS_PIPS,
+        tp_pips=TAKE_PROFIT_PIPS, pip_value=PIP_VALUE, spread=SPREAD,
+        initial_balance=INITIAL_BALANCE, bands=None):
+    """Run the Bollinger band strategy on an OHLC frame.
+
+    Adds the Upper/MA/Lower, Signal and Equity columns to df and returns
+    (df, trades_df, metrics), where metrics is (metric_names, metric_values).
+
+    For a sweep over the SL/TP settings, compute
+    bands = bollinger_bands(close, window, k) once and pass it in so the
+    indicator is not recalculated on every call.
+    """
+    # The Cython kernels only accept contiguous float64 (and int8 signal)
+    # buffers, so float32 or integer OHLC columns are converted up front.
+    close = df["Close"].to_numpy(dtype=np.float64)
+    if bands is None:
+        bands = bollinger_bands(close, window, k)
+    upper, ma, lower = (np.ascontiguousarray(band, dtype=np.float64) for band in bands)
+    df[["Upper", "MA", "Lower"]] = np.column_stack([upper, ma, lower])
+    df.loc[:, "Signal"] = generate_signals(close, upper, lower, window)
+
+    trades_df, equity = backtest(df, sl_pips, tp_pips, pip_value, spread, initial_balance)
+    df["Equity"] = equity
+
+    return df, trades_df, compute_metrics(trades_df, equity, initial_balance)
+
 
 # === CHARTING ===
-fig = make_subplots(rows=3, cols=1, shared_xaxes=True,
-                    row_heights=[0.6, 0.25, 0.15],
-                    vertical_spacing=0.03,
-                    specs=[[{"type": "candlestick"}],
-                           [{"type": "scatter"}],
-                           [{"type": "table"}]])
-
-# Candles and Bands
-fig.add_trace(go.Candlestick(x=df.index,
-                             open=df["Open"], high=df["High"],
-                             low=df["Low"], close=df["Close"],
-                             name="Candles"), row=1, col=1)
-
-fig.add_trace(go.Scatter(x=df.index, y=df["Upper"], name="Upper Band", line=dict(color="orange")), row=1, col=1)
-fig.add_trace(go.Scatter(x=df.index, y=df["Lower"], name="Lower Band", line=dict(color="orange")), row=1, col=1)
-fig.add_trace(go.Scatter(x=df.index, y=df["MA"], name="Moving Average", line=dict(color="blue")), row=1, col=1)
-
-# Buy/Sell signals
-buy_signals = df[df["Signal"] == "Buy"]
-sell_signals = df[df["Signal"] == "Sell"]
-
-fig.add_trace(go.Scatter(x=buy_signals.index, y=buy_signals["Low"],
-                         mode="markers", name="Buy", marker=dict(color="green", symbol="arrow-up", size=10)),
-              row=1, col=1)
-
-fig.add_trace(go.Scatter(x=sell_signals.index, y=sell_signals["High"],
-                         mode="markers", name="Sell", marker=dict(color="red", symbol="arrow-down", size=10)),
-              row=1, col=1)
-
-# Equity Curve
-fig.add_trace(go.Scatter(x=df.index, y=df["Equity"], name="Equity", line=dict(color="magenta", width=2)), row=2, col=1)
-
-# Metrics Table
-fig.add_trace(go.Table(
-    header=dict(values=["Metric", "Value"], fill_color="gray", font=dict(color="white", size=14), align="left"),
-    cells=dict(values=[[m[0] for m in metrics], [m[1] for m in metrics]],
-               fill_color="lightgray", align="left")), row=3, col=1)
-
-fig.update_layout(
-    title="📊 Bollinger Band Strategy Backtest",
-    height=900,
-    showlegend=True,
-    template="plotly_dark"
-)
-
-fig.show()
+def plot_results(df, metrics):
+    """Candles, bands, signals, equity curve and metrics table."""
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True,
+                        row_heights=[0.6, 0.25, 0.15],
+                        vertical_spacing=0.03,
+                        specs=[[{"type": "candlestick"}],
+                               [{"type": "scatter"}],
+                               [{"type": "table"}]])
+
+    # Plotly serializes ndarrays directly; Series go through a slower
+    # conversion. The index is passed as-is so a timezone is kept.
+    x = df.index
+    o, h, l, c = (df[col].to_numpy() for col in ("Open", "High", "Low", "Close"))
+
+    # Candles and Bands
+    fig.add_trace(go.Candlestick(x=x,
+                                 open=o, high=h,
+                                 low=l, close=c,
+                                 name="Candles"), row=1, col=1)
+
+    fig.add_trace(go.Scatter(x=x, y=df["Upper"].to_numpy(), name="Upper Band", line=dict(color="orange")), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=df["Lower"].to_numpy(), name="Lower Band", line=dict(color="orange")), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=df["MA"].to_numpy(), name="Moving Average", line=dict(color="blue")), row=1, col=1)
+
+    # Buy/Sell signals
+    sig = df["Signal"].to_numpy()
+    buy_mask = sig == SIGNAL_BUY
+    sell_mask = sig == SIGNAL_SELL
+
+    fig.add_trace(go.Scatter(x=df.index[buy_mask], y=l[buy_mask],
+                             mode="markers", name="Buy", marker=dict(color="green", symbol="arrow-up", size=10)),
+                  row=1, col=1)
+
+    fig.add_trace(go.Scatter(x=df.index[sell_mask], y=h[sell_mask],
+                             mode="markers", name="Sell", marker=dict(color="red", symbol="arrow-down", size=10)),
+                  row=1, col=1)
+
+    # Equity Curve
+    fig.add_trace(go.Scatter(x=x, y=df["Equity"].to_numpy(), name="Equity", line=dict(color="magenta", width=2)), row=2, col=1)
+
+    # Metrics Table
+    metric_names, metric_values = metrics
+    fig.add_trace(go.Table(
+        header=dict(values=["Metric", "Value"], fill_color="gray", font=dict(color="white", size=14), align="left"),
+        cells=dict(values=[metric_names, metric_values],
+                   fill_color="lightgray", align="left")), row=3, col=1)
+
+    fig.update_layout(
+        title="📊 Bollinger Band Strategy Backtest",
+        height=900,
+        showlegend=True,
+        template="plotly_dark"
+    )
+
+    return fig
+
+
+if __name__ == "__main__":
+    df, trades_df, metrics = run(make_sample_data())
+    plot_results(df, metrics).show()
@@ -0,0 +1,182 @@
+# cython: language_level=3
+"""
+Cython versions of the Bollinger_band.py kernels, for installs without numba.
+
+Build in place with:
+
+    python setup.py build_ext --inplace
+
+Bollinger_band.py picks this module up automatically when it is importable.
+The functions take and return the same arrays as their numba counterparts.
+"""
+cimport cython
+from libc.math cimport sqrt, isfinite, NAN
+
+import numpy as np
+
+cdef enum:
+    SIGNAL_NONE = 0
+    SIGNAL_BUY = 1
+    SIGNAL_SELL = 2
+    RESULT_LOSS = 0
+    RESULT_WIN = 1
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cpdef bollinger(const double[::1] close, Py_ssize_t n, double k):
+    """Rolling mean, sample std and the k-std bands in a single Welford pass."""
+    if n < 1:
+        raise ValueError("window must be at least 1")
+
+    cdef Py_ssize_t size = close.shape[0]
+    ma_arr = np.empty(size, dtype=np.float64)
+    std_arr = np.empty(size, dtype=np.float64)
+    upper_arr = np.empty(size, dtype=np.float64)
+    lower_arr = np.empty(size, dtype=np.float64)
+    cdef double[::1] ma = ma_arr
+    cdef double[::1] std = std_arr
+    cdef double[::1] upper = upper_arr
+    cdef double[::1] lower = lower_arr
+
+    cdef Py_ssize_t count = 0
+    cdef double mean = 0.0
+    cdef double m2 = 0.0
+    cdef double x, old, delta, sd
+    cdef Py_ssize_t i
+
+    for i in range(size):
+        x = close[i]
+        if isfinite(x):
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+
+        if i >= n:
+            old = close[i - n]
+            if isfinite(old):
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = old - mean
+                    mean -= delta / count
+                    m2 -= delta * (old - mean)
+
+        if count < n:
+            ma[i] = NAN
+            std[i] = NAN
+            upper[i] = NAN
+            lower[i] = NAN
+        else:
+            if n > 1:
+                sd = sqrt(m2 / (n - 1)) if m2 > 0.0 else 0.0
+            else:
+                sd = NAN
+            ma[i] = mean
+            std[i] = sd
+            upper[i] = mean + k * sd
+            lower[i] = mean - k * sd
+
+    return ma_arr, std_arr, upper_arr, lower_arr
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef generate_signals(const double[::1] close, const double[::1] upper,
+                       const double[::1] lower, Py_ssize_t start):
+    """Buy below the lower band, sell above the upper band, one position at a time."""
+    signals_arr = np.zeros(close.shape[0], dtype=np.int8)
+    cdef signed char[::1] signals = signals_arr
+    cdef bint position = False
+    cdef Py_ssize_t i
+
+    for i in range(start, close.shape[0]):
+        if not position and close[i] < lower[i]:
+            signals[i] = SIGNAL_BUY
+            position = True
+        elif position and close[i] > upper[i]:
+            signals[i] = SIGNAL_SELL
+            position = False
+
+    return signals_arr
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cpdef backtest(const double[::1] close, const double[::1] high, const double[::1] low,
+               const signed char[::1] signal, double sl_pips, double tp_pips,
+               double pip_value, double spread, double initial_balance):
+    """Fixed SL/TP long-only backtest; returns the same arrays as _run_backtest."""
+    cdef Py_ssize_t n = close.shape[0]
+    entry_idx_arr = np.empty(n, dtype=np.int64)
+    exit_idx_arr = np.empty(n, dtype=np.int64)
+    entries_arr = np.empty(n, dtype=np.float64)
+    exits_arr = np.empty(n, dtype=np.float64)
+    pips_arr = np.empty(n, dtype=np.float64)
+    results_arr = np.empty(n, dtype=np.int8)
+    balances_arr = np.empty(n, dtype=np.float64)
+    equity_arr = np.empty(n, dtype=np.float64)
+    cdef long long[::1] entry_idx = entry_idx_arr
+    cdef long long[::1] exit_idx = exit_idx_arr
+    cdef double[::1] entries = entries_arr
+    cdef double[::1] exits = exits_arr
+    cdef double[::1] pips = pips_arr
+    cdef signed char[::1] results = results_arr
+    cdef double[::1] balances = balances_arr
+    cdef double[::1] equity = equity_arr
+
+    cdef double balance = initial_balance
+    cdef bint in_trade = False
+    cdef bint closed
+    cdef Py_ssize_t open_trade_idx = 0
+    cdef double open_trade_entry = 0.0
+    cdef double sl = 0.0
+    cdef double tp = 0.0
+    cdef double exit_price, trade_pips
+    cdef signed char result
+    cdef Py_ssize_t n_trades = 0
+    cdef Py_ssize_t i
+
+    for i in range(n):
+        if signal[i] == SIGNAL_BUY and not in_trade:
+            open_trade_entry = close[i] + spread
+            sl = open_trade_entry - sl_pips * pip_value
+            tp = open_trade_entry + tp_pips * pip_value
+            open_trade_idx = i
+            in_trade = True
+
+        elif in_trade:
+            closed = False
+            exit_price = 0.0
+            result = RESULT_LOSS
+            if low[i] <= sl:
+                exit_price = sl
+                closed = True
+            elif high[i] >= tp:
+                exit_price = tp
+                result = RESULT_WIN
+                closed = True
+
+            if closed:
+                trade_pips = (exit_price - open_trade_entry) / pip_value
+                balance += trade_pips
+                entry_idx[n_trades] = open_trade_idx
+                exit_idx[n_trades] = i
+                entries[n_trades] = open_trade_entry
+                exits[n_trades] = exit_price
+                pips[n_trades] = trade_pips
+                results[n_trades] = result
+                balances[n_trades] = balance
+                n_trades += 1
+                in_trade = False
+
+        equity[i] = balance
+
+    return (entry_idx_arr[:n_trades], exit_idx_arr[:n_trades], entries_arr[:n_trades],
+            exits_arr[:n_trades], pips_arr[:n_trades], results_arr[:n_trades],
+            balances_arr[:n_trades], equity_arr)
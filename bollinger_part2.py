@@ -1,7 +1,136 @@
 import pandas as pd
 import numpy as np
 
-def zero_lag_trend_level(df, length=34, sensitivity=2.0):
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+
+def _ewm_step(weighted, old_wt, x, alpha):
+    """
+    One bar of ewm(alpha=alpha, adjust=False).mean(), NaN-aware like pandas.
+
+    The EMA is seeded with the first non-NaN input. A NaN bar repeats the
+    previous value and only decays old_wt, the weight of that value when
+    the next observation arrives.
+    """
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if x == x:
+            weighted = (old_wt * weighted + alpha * x) / (old_wt + alpha)
+            old_wt = 1.0
+    elif x == x:
+        weighted = x
+    return weighted, old_wt
+
+
+def _zltl(src, length, sensitivity, smooth_length):
+    """
+    Chained EMAs of the zero-lag trend level in one compiled loop.
+
+    Each EMA follows pandas ewm(span=..., adjust=False), including its
+    handling of NaN input (see _ewm_step).
+    """
+    n = len(src)
+    zlema = np.empty(n, dtype=np.float64)
+    trendUp = np.zeros(n, dtype=np.bool_)
+    trendDn = np.zeros(n, dtype=np.bool_)
+
+    alpha = 2.0 / (length + 1)
+    alpha_smooth = 2.0 / (smooth_length + 1)
+
+    ema1, ema1_wt = np.nan, 1.0
+    zlema_raw, zlema_raw_wt = np.nan, 1.0
+    smooth, smooth_wt = np.nan, 1.0
+
+    for i in range(n):
+        x = src[i]
+        ema1, ema1_wt = _ewm_step(ema1, ema1_wt, x, alpha)
+        adjusted = x + (x - ema1) * sensitivity
+        zlema_raw, zlema_raw_wt = _ewm_step(zlema_raw, zlema_raw_wt, adjusted, alpha)
+        smooth, smooth_wt = _ewm_step(smooth, smooth_wt, zlema_raw, alpha_smooth)
+        zlema[i] = smooth
+        if i > 0:
+            trendUp[i] = zlema[i] > zlema[i - 1]
+            trendDn[i] = zlema[i] < zlema[i - 1]
+
+    return zlema, trendUp, trendDn
+
+
+def _ema_lfilter(x, span):
+    """
+    EMA as a first-order IIR filter, y[i] = alpha*x[i] + (1-alpha)*y[i-1].
+
+    Each run of non-NaN values is filtered in one lfilter call, seeded so
+    the output matches ewm(span=..., adjust=False): the first run starts at
+    its first value, NaN bars repeat the previous output, and each later
+    run starts from the same renormalized step as _ewm_step.
+    """
+    alpha = 2.0 / (span + 1)
+    y = np.full(len(x), np.nan)
+    obs = np.flatnonzero(~np.isnan(x))
+    if obs.size == 0:
+        return y
+
+    breaks = np.flatnonzero(np.diff(obs) > 1) + 1
+    starts = obs[np.r_[0, breaks]]
+    ends = obs[np.r_[breaks - 1, obs.size - 1]] + 1
+
+    prev_end = None
+    for start, end in zip(starts, ends):
+        if prev_end is None:
+            y0 = x[start]
+        else:
+            weighted = y[prev_end - 1]
+            y[prev_end:start] = weighted
+            old_wt = (1.0 - alpha) ** (start - prev_end + 1)
+            y0 = (old_wt * weighted + alpha * x[start]) / (old_wt + alpha)
+        y[start] = y0
+        if end - start > 1:
+            y[start + 1:end], _ = lfilter([alpha], [1.0, alpha - 1.0], x[start + 1:end],
+                                          zi=[y0 * (1.0 - alpha)])
+        prev_end = end
+
+    y[prev_end:] = y[prev_end - 1]
+    return y
+
+
+def _zltl_lfilter(src, length, sensitivity, smooth_length):
+    """
+    Same result as _zltl using scipy's C filter loop instead of numba.
+    """
+    n = len(src)
+    trendUp = np.zeros(n, dtype=np.bool_)
+    trendDn = np.zeros(n, dtype=np.bool_)
+
+    ema1 = _ema_lfilter(src, length)
+    zlema_raw = _ema_lfilter(src + (src - ema1) * sensitivity, length)
+    zlema = _ema_lfilter(zlema_raw, smooth_length)
+
+    np.greater(zlema[1:], zlema[:-1], out=trendUp[1:])
+    np.less(zlema[1:], zlema[:-1], out=trendDn[1:])
+
+    return zlema, trendUp, trendDn
+
+
+# Compiled scan when numba is installed, scipy IIR filters otherwise, and
+# the plain-Python scan when neither is available
+if njit is not None:
+    _ewm_step = njit(cache=True)(_ewm_step)
+    _zltl_impl = njit(cache=True)(_zltl)
+elif lfilter is not None:
+    _zltl_impl = _zltl_lfilter
+else:
+    _zltl_impl = _zltl
+
+
+def zero_lag_trend_level(df, length=34, sensitivity=2.0, inplace=False):
     """
     Calculate Zero-Lag Trend Level (ZLTL) similar to the Pine Script indicator.
 
@@ -9,6 +138,8 @@ def zero_lag_trend_level(df, length=34, sensitivity=2.0):
     - df: DataFrame with 'close' column (prices)
     - length: Trend length (int)
     - sensitivity: Sensitivity factor (float)
+    - inplace: Add the columns to df itself instead of returning a new
+               frame (bool)
 
     Returns:
     - df with columns: 'zlema' (ZL trend level),
@@ -16,21 +147,15 @@ def zero_lag_trend_level(df, length=34, sensitivity=2.0):
                        'trendDn' (bool)
     """
 
-    def ema(series, span):
-        return series.ewm(span=span, adjust=False).mean()
-
-    src = df['close']
-
-    ema1 = ema(src, length)
-    zlema_raw = ema(src + (src - ema1) * sensitivity, length)
-
+    src = df['close'].to_numpy(dtype=np.float64)
     smooth_length = max(2, length // 3)
-    zlema = ema(zlema_raw, smooth_length)
+    zlema, trendUp, trendDn = _zltl_impl(src, length, float(sensitivity), smooth_length)
 
-    trendUp = zlema > zlema.shift(1)
-    trendDn = zlema < zlema.shift(1)
+    if not inplace:
+        # A shallow copy shares the existing column data; adding columns to
+        # it leaves the caller's df untouched.
+        df = df.copy(deep=False)
 
-    df = df.copy()
     df['zlema'] = zlema
     df['trendUp'] = trendUp
     df['trendDn'] = trendDn
@@ -43,5 +168,7 @@ def zero_lag_trend_level(df, length=34, sensitivity=2.0):
 # import yfinance as yf
 # data = yf.download("AAPL", period="1mo", interval="1h")
 # data = zero_lag_trend_level(data)
+# or, to add the columns without building a new frame:
+# zero_lag_trend_level(data, inplace=True)
 
 # Now data has the zero-lag trend level and trend direction flags.
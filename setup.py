@@ -0,0 +1,8 @@
+"""Builds the optional Cython kernels: python setup.py build_ext --inplace"""
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+setup(
+    name="trading_strategy",
+    ext_modules=cythonize([Extension("_strategy", ["_strategy.pyx"])]),
+)
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import Bollinger_band as bb
+
+
+def _close(size=300, seed=3):
+    rng = np.random.default_rng(seed)
+    return 1.1 + np.cumsum(rng.normal(0, 0.0015, size))
+
+
+def _assert_matches_rolling(close, n, k=2):
+    ma, std, upper, lower = bb.bollinger(close, n, k)
+    rolling = pd.Series(close).rolling(n)
+    exp_ma = rolling.mean().to_numpy()
+    exp_std = rolling.std().to_numpy()
+
+    np.testing.assert_allclose(ma, exp_ma, rtol=1e-9, atol=1e-10)
+    np.testing.assert_allclose(std, exp_std, rtol=1e-7, atol=1e-10)
+    np.testing.assert_allclose(upper, exp_ma + k * exp_std, rtol=1e-9, atol=1e-10)
+    np.testing.assert_allclose(lower, exp_ma - k * exp_std, rtol=1e-9, atol=1e-10)
+
+
+@pytest.mark.parametrize("n", [1, 2, 20])
+def test_bollinger_matches_pandas_rolling(n):
+    _assert_matches_rolling(_close(), n)
+
+
+def test_bollinger_nan_only_blanks_its_window():
+    close = _close()
+    close[[0, 100, 101, 250]] = np.nan
+
+    _assert_matches_rolling(close, 20)
+    ma = bb.bollinger(close, 20, 2)[0]
+    assert np.isnan(ma).sum() == pd.Series(close).rolling(20).mean().isna().sum()
+
+
+def test_bollinger_rejects_empty_window():
+    with pytest.raises(ValueError):
+        bb.bollinger(_close(), 0, 2)
+
+
+class _StubTalib:
+    """Stands in for TA-Lib: BBANDS with the population std, as TA-Lib has."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def BBANDS(self, close, timeperiod, nbdevup, nbdevdn, matype):
+        self.calls += 1
+        rolling = pd.Series(close).rolling(timeperiod)
+        middle = rolling.mean().to_numpy()
+        std = rolling.std(ddof=0).to_numpy()
+        return middle + nbdevup * std, middle, middle - nbdevdn * std
+
+
+@pytest.fixture
+def stub_talib(monkeypatch):
+    stub = _StubTalib()
+    monkeypatch.setattr(bb, "talib", stub)
+    return stub
+
+
+def test_bollinger_bands_talib_matches_sample_std_bands(stub_talib):
+    close = _close()
+    upper, ma, lower = bb.bollinger_bands(close, 20, 2)
+
+    assert stub_talib.calls == 1
+    rolling = pd.Series(close).rolling(20)
+    exp_ma = rolling.mean().to_numpy()
+    exp_std = rolling.std().to_numpy()
+    np.testing.assert_allclose(ma, exp_ma, rtol=1e-12)
+    np.testing.assert_allclose(upper, exp_ma + 2 * exp_std, rtol=1e-12)
+    np.testing.assert_allclose(lower, exp_ma - 2 * exp_std, rtol=1e-12)
+
+
+@pytest.mark.parametrize("nan_input,n", [(True, 20), (False, 1)])
+def test_bollinger_bands_skips_talib_for_nan_or_short_window(stub_talib, nan_input, n):
+    close = _close()
+    if nan_input:
+        close[100] = np.nan
+
+    upper, ma, lower = bb.bollinger_bands(close, n, 2)
+
+    assert stub_talib.calls == 0
+    exp_ma, _, exp_upper, exp_lower = bb.bollinger(close, n, 2)
+    np.testing.assert_array_equal(ma, exp_ma)
+    np.testing.assert_array_equal(upper, exp_upper)
+    np.testing.assert_array_equal(lower, exp_lower)
+
+
+def test_run_recomputes_bands_after_close_is_replaced():
+    df = bb.make_sample_data()
+    bb.run(df)
+    df["Close"] = df["Close"] * 2
+    df, _, _ = bb.run(df)
+
+    expected = pd.Series(df["Close"]).rolling(bb.BOLLINGER_WINDOW).mean().to_numpy()
+    np.testing.assert_allclose(df["MA"].to_numpy(), expected, rtol=1e-9)
+
+
+def test_run_with_precomputed_bands():
+    df = bb.make_sample_data()
+    bands = bb.bollinger_bands(df["Close"].to_numpy(), bb.BOLLINGER_WINDOW, bb.BOLLINGER_STD)
+
+    _, trades, metrics = bb.run(df.copy())
+    _, trades_swept, metrics_swept = bb.run(df.copy(), bands=bands)
+
+    pd.testing.assert_frame_equal(trades, trades_swept)
+    assert metrics == metrics_swept
+
+
+@pytest.fixture(scope="module")
+def backends():
+    strategy = pytest.importorskip("_strategy")
+    return bb._numba_kernels, strategy
+
+
+@pytest.mark.parametrize("n", [1, 2, 20])
+def test_cython_bollinger_matches_numba(backends, n):
+    numba_kernels, strategy = backends
+    close = _close()
+    close[[0, 100, 250]] = np.nan
+
+    expected_bands = numba_kernels["bollinger"](close, n, 2.0)
+    for got, expected in zip(strategy.bollinger(close, n, 2.0), expected_bands):
+        np.testing.assert_allclose(got, expected, rtol=1e-12, atol=1e-15)
+
+
+def test_cython_signals_and_backtest_match_numba(backends):
+    numba_kernels, strategy = backends
+    df = bb.make_sample_data(periods=2000)
+    close, high, low = (df[col].to_numpy(copy=True) for col in ("Close", "High", "Low"))
+    close[500] = np.nan
+    _, _, upper, lower = numba_kernels["bollinger"](close, 20, 2.0)
+
+    signals = numba_kernels["generate_signals"](close, upper, lower, 20)
+    np.testing.assert_array_equal(strategy.generate_signals(close, upper, lower, 20), signals)
+
+    args = (close, high, low, signals, 20.0, 40.0, 0.0001, 0.0002, 1000.0)
+    expected_trades = numba_kernels["backtest"](*args)
+    assert len(expected_trades[0]) > 0
+    for got, expected in zip(strategy.backtest(*args), expected_trades):
+        np.testing.assert_array_equal(got, expected)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.int64])
+def test_run_accepts_non_float64_ohlc(dtype):
+    df = bb.make_sample_data()
+    if dtype is np.int64:
+        df = (df * 100000).round()
+    df = df.astype(dtype)
+
+    _, trades, _ = bb.run(df)
+    assert len(df["Equity"]) == len(df)
+    assert trades["result"].isin([bb.RESULT_LOSS, bb.RESULT_WIN]).all()
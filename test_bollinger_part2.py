@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import bollinger_part2 as zl
+
+
+def _close(size=500, seed=5):
+    rng = np.random.default_rng(seed)
+    return 100 + np.cumsum(rng.normal(0, 1, size))
+
+
+def _reference(close, length=34, sensitivity=2.0):
+    """The original pandas ewm implementation."""
+    def ema(series, span):
+        return series.ewm(span=span, adjust=False).mean()
+
+    src = pd.Series(close)
+    ema1 = ema(src, length)
+    zlema_raw = ema(src + (src - ema1) * sensitivity, length)
+    zlema = ema(zlema_raw, max(2, length // 3))
+    return zlema.to_numpy(), (zlema > zlema.shift(1)).to_numpy(), (zlema < zlema.shift(1)).to_numpy()
+
+
+def _with_nans(*positions):
+    close = _close()
+    close[list(positions)] = np.nan
+    return close
+
+
+CASES = {
+    "no_nan": _close(),
+    "nan_inside": _with_nans(100, 200, 201, 202),
+    "leading_nan": _with_nans(0, 1, 2),
+    "trailing_nan": _with_nans(300, 498, 499),
+}
+
+
+# "default" is whichever backend bollinger_part2 picked for the installed
+# dependencies; the others are exercised directly when they can run.
+KERNELS = {
+    "default": zl._zltl_impl,
+    "python": zl._zltl,
+    "lfilter": zl._zltl_lfilter,
+}
+
+
+@pytest.mark.parametrize("kernel", KERNELS)
+@pytest.mark.parametrize("case", CASES)
+def test_zltl_kernel_matches_pandas_ewm(kernel, case):
+    if kernel == "lfilter" and zl.lfilter is None:
+        pytest.skip("scipy is not installed")
+    close = CASES[case]
+    zlema, trendUp, trendDn = KERNELS[kernel](close, 34, 2.0, 11)
+    exp_zlema, exp_up, exp_dn = _reference(close)
+
+    np.testing.assert_allclose(zlema, exp_zlema, rtol=1e-10)
+    np.testing.assert_array_equal(trendUp, exp_up)
+    np.testing.assert_array_equal(trendDn, exp_dn)
+
+
+def test_zero_lag_trend_level_columns():
+    close = CASES["nan_inside"]
+    df = pd.DataFrame({'close': close})
+    out = zl.zero_lag_trend_level(df)
+
+    exp_zlema, exp_up, exp_dn = _reference(close)
+    np.testing.assert_allclose(out['zlema'].to_numpy(), exp_zlema, rtol=1e-10)
+    np.testing.assert_array_equal(out['trendUp'].to_numpy(), exp_up)
+    np.testing.assert_array_equal(out['trendDn'].to_numpy(), exp_dn)
+
+
+def test_zero_lag_trend_level_leaves_input_alone():
+    df = pd.DataFrame({'open': _close(seed=1), 'close': _close()})
+    before = df.copy()
+
+    out = zl.zero_lag_trend_level(df)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert list(out.columns) == ['open', 'close', 'zlema', 'trendUp', 'trendDn']
+    pd.testing.assert_frame_equal(out[['open', 'close']], before)
+
+
+def test_zero_lag_trend_level_inplace():
+    df = pd.DataFrame({'close': _close()})
+    out = zl.zero_lag_trend_level(df, inplace=True)
+
+    assert out is df
+    assert list(df.columns) == ['close', 'zlema', 'trendUp', 'trendDn']